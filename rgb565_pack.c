@@ -0,0 +1,114 @@
+// Optional RGB888/BGRA8888 -> RGB565 packers for send.py, loaded via ctypes.
+//
+// Build (gcc/clang):
+//   cc -O3 -shared -fPIC -o rgb565_pack.so rgb565_pack.c
+//
+// The AVX2 path is selected at runtime, so the library also works on CPUs
+// without AVX2 and on non-x86 machines (scalar loop).
+
+#include <stddef.h>
+#include <stdint.h>
+
+static inline uint16_t pack_pixel(const uint8_t* p) {
+  return (uint16_t)(((p[0] & 0xF8) << 8) | ((p[1] & 0xFC) << 3) | (p[2] >> 3));
+}
+
+static void pack_scalar(const uint8_t* rgb, uint16_t* out, size_t npix) {
+  for (size_t i = 0; i < npix; i++) {
+    out[i] = pack_pixel(rgb + i * 3);
+  }
+}
+
+static void pack_bgra_scalar(const uint8_t* bgra, uint16_t* out, size_t npix) {
+  for (size_t i = 0; i < npix; i++) {
+    const uint8_t* p = bgra + i * 4;
+    out[i] = (uint16_t)(((p[2] & 0xF8) << 8) | ((p[1] & 0xFC) << 3) | (p[0] >> 3));
+  }
+}
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+
+// Pack 4 pixels per 128-bit lane. shuffle_rg widens R into 16-bit slots 0-3
+// and G into slots 4-7, shuffle_b widens B into slots 0-3; after mask/shift
+// the G half is moved down and everything is OR-ed together. The 8 packed
+// pixels end up in the low 128 bits.
+__attribute__((target("avx2")))
+static inline __m128i pack_lanes(__m256i v, __m256i shuffle_rg, __m256i shuffle_b) {
+  const __m256i mask_r = _mm256_set1_epi16(0xF8);
+  const __m256i mask_g = _mm256_set1_epi16(0xFC);
+
+  __m256i rg = _mm256_shuffle_epi8(v, shuffle_rg);
+  __m256i b = _mm256_shuffle_epi8(v, shuffle_b);
+
+  __m256i r565 = _mm256_slli_epi16(_mm256_and_si256(rg, mask_r), 8);
+  __m256i g565 = _mm256_srli_si256(_mm256_slli_epi16(_mm256_and_si256(rg, mask_g), 3), 8);
+  __m256i b565 = _mm256_srli_epi16(b, 3);
+  __m256i px = _mm256_or_si256(_mm256_or_si256(r565, g565), b565);
+
+  // Valid pixels sit in the low 64 bits of each lane
+  px = _mm256_permute4x64_epi64(px, _MM_SHUFFLE(3, 1, 2, 0));
+  return _mm256_castsi256_si128(px);
+}
+
+// RGB: each lane is loaded with 4 pixels (12 bytes) on its own
+__attribute__((target("avx2")))
+static void pack_avx2(const uint8_t* rgb, uint16_t* out, size_t npix) {
+  const __m256i shuffle_rg = _mm256_setr_epi8(
+      0, -1, 3, -1, 6, -1, 9, -1, 1, -1, 4, -1, 7, -1, 10, -1,
+      0, -1, 3, -1, 6, -1, 9, -1, 1, -1, 4, -1, 7, -1, 10, -1);
+  const __m256i shuffle_b = _mm256_setr_epi8(
+      2, -1, 5, -1, 8, -1, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+      2, -1, 5, -1, 8, -1, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1);
+
+  size_t i = 0;
+  // The second lane load reads 4 bytes past the 8th pixel, so stop early
+  for (; i + 10 <= npix; i += 8) {
+    const uint8_t* p = rgb + i * 3;
+    __m256i v = _mm256_inserti128_si256(
+        _mm256_castsi128_si256(_mm_loadu_si128((const __m128i*)p)),
+        _mm_loadu_si128((const __m128i*)(p + 12)), 1);
+    _mm_storeu_si128((__m128i*)(out + i), pack_lanes(v, shuffle_rg, shuffle_b));
+  }
+  pack_scalar(rgb + i * 3, out + i, npix - i);
+}
+
+// BGRA: 8 pixels fill a 256-bit register exactly; the shuffles pick R, G
+// and B from the stride-4 positions and skip alpha
+__attribute__((target("avx2")))
+static void pack_bgra_avx2(const uint8_t* bgra, uint16_t* out, size_t npix) {
+  const __m256i shuffle_rg = _mm256_setr_epi8(
+      2, -1, 6, -1, 10, -1, 14, -1, 1, -1, 5, -1, 9, -1, 13, -1,
+      2, -1, 6, -1, 10, -1, 14, -1, 1, -1, 5, -1, 9, -1, 13, -1);
+  const __m256i shuffle_b = _mm256_setr_epi8(
+      0, -1, 4, -1, 8, -1, 12, -1, -1, -1, -1, -1, -1, -1, -1, -1,
+      0, -1, 4, -1, 8, -1, 12, -1, -1, -1, -1, -1, -1, -1, -1, -1);
+
+  size_t i = 0;
+  for (; i + 8 <= npix; i += 8) {
+    __m256i v = _mm256_loadu_si256((const __m256i*)(bgra + i * 4));
+    _mm_storeu_si128((__m128i*)(out + i), pack_lanes(v, shuffle_rg, shuffle_b));
+  }
+  pack_bgra_scalar(bgra + i * 4, out + i, npix - i);
+}
+#endif
+
+void pack_rgb565(const uint8_t* rgb, uint16_t* out, size_t npix) {
+#if defined(__x86_64__) || defined(__i386__)
+  if (__builtin_cpu_supports("avx2")) {
+    pack_avx2(rgb, out, npix);
+    return;
+  }
+#endif
+  pack_scalar(rgb, out, npix);
+}
+
+void pack_rgb565_bgra(const uint8_t* bgra, uint16_t* out, size_t npix) {
+#if defined(__x86_64__) || defined(__i386__)
+  if (__builtin_cpu_supports("avx2")) {
+    pack_bgra_avx2(bgra, out, npix);
+    return;
+  }
+#endif
+  pack_bgra_scalar(bgra, out, npix);
+}
@@ -1,14 +1,28 @@
 #!/usr/bin/env python3
 
 # pip3 install numpy --break-system-packages
+# pip3 install numba --break-system-packages  (optional, faster frame diffing)
+# pip3 install mss --break-system-packages  (optional, faster screen capture)
+# pip3 install xxhash --break-system-packages  (optional, hash-based frame diffing without numba)
+# cc -O3 -shared -fPIC -o rgb565_pack.so rgb565_pack.c  (optional, SIMD RGB565 packing)
 
 import time
 from PIL import ImageGrab, Image
 import socket
-from typing import Tuple, List, Optional, NamedTuple, Callable, Literal
+import struct
+from typing import Tuple, List, Dict, Optional, NamedTuple, Callable, Literal
 import numpy as np
 import argparse
+import functools
+import ctypes
+import os
+import queue
 import sys
+import threading
+
+# Pixel layouts accepted by the RGB565 packers: processed frames are RGB,
+# raw mss grabs are BGRA
+ChannelOrder = Literal['RGB', 'BGRA']
 
 class Region(NamedTuple):
     x: int
@@ -17,47 +31,148 @@ class Region(NamedTuple):
     height: int
     data: bytes
 
+class FrameUpdate(NamedTuple):
+    """Which chunks of a frame changed, plus the frame packed to RGB565"""
+    changed: np.ndarray
+    frame_565: Optional[np.ndarray]
+    chunk_size: int
+
+# Region metadata on the wire: x, y, width, height as big-endian uint16
+REGION_HEADER = struct.Struct('>HHHH')
+
+# Most regions the display accepts in one update (MAX_REGIONS in src/main.cpp)
+MAX_REGIONS = 100
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+try:
+    import mss
+    HAS_MSS = True
+except ImportError:
+    HAS_MSS = False
+
+def load_rgb565_lib() -> Optional[ctypes.CDLL]:
+    """Load the optional compiled RGB565 packer next to this script"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rgb565_pack.so')
+    try:
+        lib = ctypes.CDLL(path)
+        for func in (lib.pack_rgb565, lib.pack_rgb565_bgra):
+            func.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+            func.restype = None
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+RGB565_LIB = load_rgb565_lib()
+
 # Image Processing Functions
-def rgb888_to_rgb565(r: int, g: int, b: int) -> Tuple[int, int]:
-    """Convert RGB888 to RGB565 bytes"""
-    rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-    return rgb565 & 0xFF, (rgb565 >> 8) & 0xFF
+def pil_to_np(image: Image.Image) -> np.ndarray:
+    """Read-only HxWx3 view of an image's pixels
 
-def image_to_rgb565_bytes(image: Image.Image) -> bytes:
-    """Convert image to RGB565 format bytes"""
+    np.asarray wraps the single buffer Pillow exports instead of copying it
+    again like np.array does.
+    """
     if image.mode != 'RGB':
         image = image.convert('RGB')
-    
-    pixels = []
-    width, height = image.size
-    for y in range(height):
-        for x in range(width):
-            r, g, b = image.getpixel((x, y))
-            lsb, msb = rgb888_to_rgb565(r, g, b)
-            pixels.extend([lsb, msb])
-    
-    return bytes(pixels)
+    image.load()
+    return np.asarray(image)
+
+def pack_rgb565(arr: np.ndarray, channel_order: ChannelOrder = 'RGB') -> np.ndarray:
+    """Pack an HxWx3 RGB888 (or HxWx4 BGRA) array into an HxW little-endian RGB565 array"""
+    if (RGB565_LIB is not None and arr.dtype == np.uint8 and arr.ndim == 3
+            and arr.shape[2] == len(channel_order) and arr.flags.c_contiguous):
+        out = np.empty(arr.shape[:2], dtype='<u2')
+        pack = RGB565_LIB.pack_rgb565 if channel_order == 'RGB' else RGB565_LIB.pack_rgb565_bgra
+        pack(arr.ctypes.data, out.ctypes.data, out.size)
+        return out
+    if channel_order == 'RGB':
+        r, g, b = arr[..., 0], arr[..., 1], arr[..., 2]
+    else:
+        r, g, b = arr[..., 2], arr[..., 1], arr[..., 0]
+    rgb565 = ((r.astype(np.uint16) & 0xF8) << 8) | ((g.astype(np.uint16) & 0xFC) << 3) | (b >> 3)
+    return rgb565.astype('<u2')
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def pack_and_diff(curr, prev, out565, changed, chunk_size, red, blue):
+        """Pack curr into out565 and flag changed chunks in a single pass
 
-def get_screen_size() -> Tuple[int, int]:
+        red/blue are the channel indices of R and B (G is always 1). changed
+        must be zeroed; each parallel iteration owns one row of chunks.
+        """
+        height, width = curr.shape[0], curr.shape[1]
+        for row in prange(changed.shape[0]):
+            for y in range(row * chunk_size, min((row + 1) * chunk_size, height)):
+                for x in range(width):
+                    r = np.uint16(curr[y, x, red])
+                    g = np.uint16(curr[y, x, 1])
+                    b = np.uint16(curr[y, x, blue])
+                    out565[y, x] = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+                    if r != prev[y, x, red] or g != prev[y, x, 1] or b != prev[y, x, blue]:
+                        changed[row, x // chunk_size] = True
+
+def get_screen_size(sct=None) -> Tuple[int, int]:
     """Get the primary screen resolution"""
+    if sct is not None:
+        monitor = sct.monitors[1]
+        return monitor['width'], monitor['height']
     screenshot = ImageGrab.grab()
     return screenshot.size
 
-def capture_screen_area(area: Tuple[int, int, int, int]) -> Image.Image:
-    """Capture screen area and return PIL Image"""
+def capture_screen_area(area: Tuple[int, int, int, int], sct=None) -> Image.Image:
+    """Capture screen area and return PIL Image
+
+    With an mss instance the raw BGRA grab is decoded straight to RGB in one
+    pass; otherwise PIL.ImageGrab is used.
+    """
+    if sct is not None:
+        monitor = sct.monitors[1]
+        left, top, right, bottom = area
+        shot = sct.grab({
+            'left': monitor['left'] + left,
+            'top': monitor['top'] + top,
+            'width': right - left,
+            'height': bottom - top,
+        })
+        return Image.frombytes('RGB', shot.size, shot.raw, 'raw', 'BGRX')
     return ImageGrab.grab(bbox=area)
 
-def get_region_data(image: Image.Image, x: int, y: int, width: int, height: int) -> bytes:
-    """Extract data for a specific region from the image"""
-    region = image.crop((x, y, x + width, y + height))
-    return image_to_rgb565_bytes(region)
+def capture_screen_array(area: Tuple[int, int, int, int], sct) -> Optional[np.ndarray]:
+    """Capture screen area with mss as an HxWx4 BGRA array, without copying
+
+    Returns None if the grab does not have the requested size, e.g. on HiDPI
+    screens where mss returns physical pixels.
+    """
+    monitor = sct.monitors[1]
+    left, top, right, bottom = area
+    shot = sct.grab({
+        'left': monitor['left'] + left,
+        'top': monitor['top'] + top,
+        'width': right - left,
+        'height': bottom - top,
+    })
+    if shot.size != (right - left, bottom - top):
+        return None
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
 
 # Display Mode Processors
-def process_full(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+def process_full(image: Image.Image, target_size: Tuple[int, int],
+                 resample: Image.Resampling = Image.Resampling.BILINEAR) -> Image.Image:
     """Full mode: no processing, just resize"""
-    return image.resize(target_size, Image.Resampling.LANCZOS)
+    return image.resize(target_size, resample)
 
-def process_crop(image: Image.Image, target_size: Tuple[int, int], crop_mode: Literal['both', 'start', 'end'] = 'both') -> Image.Image:
+def process_crop(image: Image.Image, target_size: Tuple[int, int], crop_mode: Literal['both', 'start', 'end'] = 'both',
+                 resample: Image.Resampling = Image.Resampling.BILINEAR) -> Image.Image:
     """Crop mode: crop image to match target ratio
     
     Args:
@@ -67,6 +182,7 @@ def process_crop(image: Image.Image, target_size: Tuple[int, int], crop_mode: Li
             - 'both': crop both sides equally
             - 'start': keep start side (left/top)
             - 'end': keep end side (right/bottom)
+        resample: Resampling filter used for the final resize
     """
     width, height = image.size
     target_ratio = target_size[0] / target_size[1]
@@ -93,9 +209,10 @@ def process_crop(image: Image.Image, target_size: Tuple[int, int], crop_mode: Li
             y = height - new_height
         cropped = image.crop((0, y, width, y + new_height))
     
-    return cropped.resize(target_size, Image.Resampling.LANCZOS)
+    return cropped.resize(target_size, resample)
 
-def process_pad(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+def process_pad(image: Image.Image, target_size: Tuple[int, int],
+                resample: Image.Resampling = Image.Resampling.BILINEAR) -> Image.Image:
     """Pad mode: pad to match target ratio"""
     width, height = image.size
     target_ratio = target_size[0] / target_size[1]
@@ -114,91 +231,295 @@ def process_pad(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image
         x_offset = (new_width - width) // 2
         new_image.paste(image, (x_offset, 0))
     
-    return new_image.resize(target_size, Image.Resampling.LANCZOS)
+    return new_image.resize(target_size, resample)
 
 def get_processor(mode: str) -> Callable:
     """Get the appropriate image processor for the given mode"""
     return DISPLAY_MODES.get(mode, process_full)
 
 # Network Functions
-def find_changed_regions(current: Image.Image, previous: Optional[Image.Image], chunk_size: int = 32) -> List[Region]:
-    """Find regions that have changed between two frames"""
-    if previous is None:
+def hash_changed_chunks(frame_565: np.ndarray, chunk_hashes: Dict[Tuple[int, int], int], chunk_size: int = 32) -> np.ndarray:
+    """Flag chunks whose xxh3 hash differs from chunk_hashes, updating it in place"""
+    height, width = frame_565.shape
+    rows = -(-height // chunk_size)
+    cols = -(-width // chunk_size)
+    pad_height = rows * chunk_size - height
+    pad_width = cols * chunk_size - width
+    if pad_height or pad_width:
+        frame_565 = np.pad(frame_565, ((0, pad_height), (0, pad_width)))
+
+    # Reorder into chunk-major layout so every chunk is one contiguous buffer
+    chunks = np.ascontiguousarray(frame_565.reshape(rows, chunk_size, cols, chunk_size).swapaxes(1, 2))
+
+    changed = np.zeros((rows, cols), dtype=np.bool_)
+    for row in range(rows):
+        for col in range(cols):
+            digest = xxhash.xxh3_64_intdigest(chunks[row, col])
+            if chunk_hashes.get((row, col)) != digest:
+                chunk_hashes[(row, col)] = digest
+                changed[row, col] = True
+    return changed
+
+def merge_changed_chunks(changed: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Merge a grid of changed chunks into rectangles (row, col, rows, cols)
+
+    Each grid row is split into runs of changed chunks; a run extends the
+    rectangle from the row above when it spans exactly the same columns.
+    """
+    rects = []
+    # Rectangles ending on the previous row, keyed by their column span
+    open_rects = {}
+    for row in range(changed.shape[0]):
+        edges = np.flatnonzero(np.diff(changed[row], prepend=False, append=False))
+        next_open = {}
+        for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            index = open_rects.get((start, end))
+            if index is None:
+                index = len(rects)
+                rects.append((row, start, 1, end - start))
+            else:
+                top, col, rows, cols = rects[index]
+                rects[index] = (top, col, rows + 1, cols)
+            next_open[(start, end)] = index
+        open_rects = next_open
+    return rects
+
+def find_changed_chunks(current: np.ndarray, previous: Optional[np.ndarray], chunk_size: int = 32,
+                        channel_order: ChannelOrder = 'RGB',
+                        chunk_hashes: Optional[Dict[Tuple[int, int], int]] = None) -> FrameUpdate:
+    """Find the chunks that have changed between two frame arrays
+
+    If chunk_hashes is given and xxhash is installed (but numba is not), chunks
+    are compared by the hashes stored there from earlier frames instead of
+    against previous; on the first call every chunk counts as changed. Hashes
+    cover the packed RGB565 data, so changes the display cannot show are
+    skipped.
+    """
+    height, width = current.shape[:2]
+    rows = -(-height // chunk_size)
+    cols = -(-width // chunk_size)
+    use_hashes = chunk_hashes is not None and HAS_XXHASH and not HAS_NUMBA
+
+    # Pack the whole frame once; each region's data is then a slice of it
+    if previous is None and not use_hashes:
         # First frame - send everything
-        return [Region(
-            x=0, y=0,
-            width=current.width,
-            height=current.height,
-            data=image_to_rgb565_bytes(current)
-        )]
+        current_565 = pack_rgb565(current, channel_order)
+        changed = np.ones((rows, cols), dtype=np.bool_)
+    elif use_hashes:
+        current_565 = pack_rgb565(current, channel_order)
+        changed = hash_changed_chunks(current_565, chunk_hashes, chunk_size)
+    elif HAS_NUMBA:
+        current_565 = np.empty((height, width), dtype='<u2')
+        changed = np.zeros((rows, cols), dtype=np.bool_)
+        red, blue = (0, 2) if channel_order == 'RGB' else (2, 0)
+        pack_and_diff(current, previous, current_565, changed, chunk_size, red, blue)
+    else:
+        # Pad both frames up to whole chunks so they reshape into a tile grid
+        curr_array = current
+        prev_array = previous
+        pad_height = rows * chunk_size - height
+        pad_width = cols * chunk_size - width
+        if pad_height or pad_width:
+            pad = ((0, pad_height), (0, pad_width), (0, 0))
+            curr_array = np.pad(curr_array, pad)
+            prev_array = np.pad(prev_array, pad)
+
+        # Reduce each chunk to a single "changed" flag in one pass; the colour
+        # channels are the first three in both layouts, BGRA's alpha is ignored
+        tiles = (rows, chunk_size, cols, chunk_size, -1)
+        diff = curr_array.reshape(tiles) != prev_array.reshape(tiles)
+        changed = diff[..., :3].any(axis=(1, 3, 4))
+
+        # A static frame needs no RGB565 data at all
+        current_565 = pack_rgb565(current, channel_order) if changed.any() else None
 
+    return FrameUpdate(changed, current_565, chunk_size)
+
+def build_regions(update: FrameUpdate) -> List[Region]:
+    """Turn a frame update into regions, merging neighbouring changed chunks"""
+    rects = merge_changed_chunks(update.changed)
+    if not rects:
+        return []
+    if len(rects) > MAX_REGIONS:
+        # Too many pieces for one update; send the whole frame instead
+        rows, cols = update.changed.shape
+        rects = [(0, 0, rows, cols)]
+
+    chunk_size = update.chunk_size
+    height, width = update.frame_565.shape
     regions = []
-    # Convert images to numpy arrays for faster comparison
-    curr_array = np.array(current)
-    prev_array = np.array(previous)
-    
-    height, width = curr_array.shape[:2]
-    
-    # Check each chunk for changes
-    for y in range(0, height, chunk_size):
-        for x in range(0, width, chunk_size):
-            chunk_width = min(chunk_size, width - x)
-            chunk_height = min(chunk_size, height - y)
-            
-            curr_chunk = curr_array[y:y+chunk_height, x:x+chunk_width]
-            prev_chunk = prev_array[y:y+chunk_height, x:x+chunk_width]
-            
-            if not np.array_equal(curr_chunk, prev_chunk):
-                region_data = get_region_data(
-                    current, x, y, chunk_width, chunk_height)
-                regions.append(Region(
-                    x=x, y=y,
-                    width=chunk_width,
-                    height=chunk_height,
-                    data=region_data
-                ))
-    
+    for row, col, rows, cols in rects:
+        x = col * chunk_size
+        y = row * chunk_size
+        region_width = min(cols * chunk_size, width - x)
+        region_height = min(rows * chunk_size, height - y)
+        regions.append(Region(
+            x=x, y=y,
+            width=region_width,
+            height=region_height,
+            data=update.frame_565[y:y+region_height, x:x+region_width].tobytes()
+        ))
+
     return regions
 
-def send_regions(ip: str, regions: List[Region], port: int = 80, timeout: float = 1.0) -> bool:
-    """Send update regions to display"""
-    if not regions:
-        return True
+def find_changed_regions(current: np.ndarray, previous: Optional[np.ndarray], chunk_size: int = 32,
+                         channel_order: ChannelOrder = 'RGB',
+                         chunk_hashes: Optional[Dict[Tuple[int, int], int]] = None) -> List[Region]:
+    """Find regions that have changed between two frame arrays"""
+    return build_regions(find_changed_chunks(current, previous, chunk_size, channel_order, chunk_hashes))
+
+def enable_quickack(sock: socket.socket):
+    """Acknowledge incoming data immediately (Linux only)
+
+    The kernel may fall back to delayed ACKs after a while, so this is
+    re-armed after every read.
+    """
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+class DisplayClient:
+    """Persistent connection to the display, reopened on demand after errors"""
+
+    def __init__(self, ip: str, port: int = 80, timeout: float = 1.0):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+
+    def connect(self) -> socket.socket:
+        """Return the open socket, connecting first if needed"""
+        if self.sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                # Disable Nagle and allow a whole frame to sit in the send buffer
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+                sock.settimeout(self.timeout)
+                sock.connect((self.ip, self.port))
+                enable_quickack(sock)
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+        return self.sock
+
+    def close(self):
+        """Close the connection; the next send reconnects"""
+        if self.sock is not None:
+            # Reset instead of a graceful close: nothing unsent is worth
+            # keeping, and reconnects after errors skip TIME_WAIT
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+    def send_regions(self, regions: List[Region]) -> bool:
+        """Send update regions to display"""
+        if not regions:
+            return True
+        if len(regions) > MAX_REGIONS:
+            raise ValueError(f"{len(regions)} regions exceed the display's limit of {MAX_REGIONS}")
+
+        # Build the whole update in one buffer: region count, then
+        # metadata + pixel data for each region
+        parts = [len(regions).to_bytes(1, byteorder='big')]
+        for region in regions:
+            parts.append(REGION_HEADER.pack(region.x, region.y, region.width, region.height))
+            parts.append(region.data)
+        buf = b''.join(parts)
+
+        # A reused connection may have gone stale (e.g. the display
+        # restarted), so retry once on a fresh one before giving up
+        for _ in range(2):
+            reused = self.sock is not None
+            try:
+                sock = self.connect()
+                sock.sendall(buf)
+
+                # Wait for acknowledgment
+                response = b''
+                while len(response) < 2:
+                    chunk = sock.recv(2 - len(response))
+                    if not chunk:
+                        break
+                    response += chunk
+                enable_quickack(sock)
+                if response == b'OK':
+                    return True
+
+            except OSError as e:
+                # print(f"Error sending update: {e}")
+                pass
+
+            # Drop the connection so the next attempt starts from a clean stream
+            self.close()
+            if not reused:
+                break
 
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.connect((ip, port))
-            sock.settimeout(timeout)
-            # Send number of regions
-            sock.send(len(regions).to_bytes(1, byteorder='big'))
-            for region in regions:
-                # Send region metadata
-                sock.send(region.x.to_bytes(2, byteorder='big'))
-                sock.send(region.y.to_bytes(2, byteorder='big'))
-                sock.send(region.width.to_bytes(2, byteorder='big'))
-                sock.send(region.height.to_bytes(2, byteorder='big'))
-                
-                # Send region data
-                chunk_size = 1024
-                data = region.data
-                for i in range(0, len(data), chunk_size):
-                    chunk = data[i:i + chunk_size]
-                    sock.send(chunk)
-            
-            # Wait for acknowledgment
-            response = sock.recv(2)
-            return response == b'OK'
-            
-    except Exception as e:
-        # print(f"Error sending update: {e}")
         return False
 
+def merge_updates(*updates: FrameUpdate) -> FrameUpdate:
+    """Merge pending updates oldest first into one update
+
+    Every chunk changed in any of them is sent with the newest frame's data,
+    so the result is never larger than a full frame.
+    """
+    changed = np.logical_or.reduce([update.changed for update in updates])
+    return updates[-1]._replace(changed=changed)
+
+def drain_updates(updates: queue.Queue) -> List[FrameUpdate]:
+    """Take every update still waiting in the queue, oldest first"""
+    pending = []
+    while True:
+        try:
+            pending.append(updates.get_nowait())
+        except queue.Empty:
+            return pending
+
+def queue_update(updates: queue.Queue, update: FrameUpdate):
+    """Queue an update for the sender thread without blocking capture
+
+    When the queue is full the pending updates are folded into this one
+    rather than dropped, since each frame only carries what changed.
+    """
+    while True:
+        try:
+            updates.put_nowait(update)
+            return
+        except queue.Full:
+            update = merge_updates(*drain_updates(updates), update)
+
+def send_worker(client: DisplayClient, updates: queue.Queue):
+    """Send queued updates until a None sentinel arrives"""
+    last_print = 0.0
+    while True:
+        update = updates.get()
+        if update is None:
+            return
+        start_time = time.time()
+        try:
+            regions = build_regions(update)
+            ok = client.send_regions(regions)
+        except Exception as e:
+            # Report and carry on; one bad update must not stop the sender
+            client.close()
+            clear_line()
+            print(f"Error sending update: {e}")
+            continue
+        now = time.time()
+        # Redraw the status line at most ~10 times per second
+        if now - last_print >= 0.1:
+            print_status(len(regions), sum(len(region.data) for region in regions), now - start_time, ok)
+            last_print = now
+
 # Display Mode Registry
 DISPLAY_MODES = {
     'full': process_full,
-    'crop-both': lambda img, size: process_crop(img, size, 'both'),
-    'crop-start': lambda img, size: process_crop(img, size, 'start'),
-    'crop-end': lambda img, size: process_crop(img, size, 'end'),
+    'crop-both': functools.partial(process_crop, crop_mode='both'),
+    'crop-start': functools.partial(process_crop, crop_mode='start'),
+    'crop-end': functools.partial(process_crop, crop_mode='end'),
     'pad': process_pad,
 }
 
@@ -215,6 +536,9 @@ def parse_args():
         'Display mode: full (no processing), crop-both (crop both sides), '
         'crop-start (keep start side), crop-end (keep end side), '
         'pad (add black padding)')
+    parser.add_argument('--filter', type=str, choices=['nearest', 'bilinear', 'bicubic', 'lanczos'], default='bilinear',
+        help='Resize filter: bilinear (fast, default), lanczos (best quality, slower), '
+        'bicubic, nearest')
 
     return parser.parse_args()
 
@@ -223,17 +547,12 @@ def clear_line():
     sys.stdout.write('\033[2K\033[1G')
     sys.stdout.flush()
 
-def print_progress(current: int, total: int, width: int = 50):
-    """Print a simple progress bar with color"""
-    progress = current / total
-    bar_width = int(width * progress)
-    # Use red for completed part only, with spaces for padding
-    bar = '\033[31m' + '━' * bar_width + ' ' * (width - bar_width) + '\033[0m'
-    percent = int(progress * 100)
-    # Move cursor to the start of the progress bar and clear to end of line
+def print_status(regions: int, size: int, elapsed: float, ok: bool = True):
+    """Print a one-line summary of the last update"""
+    status = 'Sent' if ok else '\033[31mFailed\033[0m'
+    # Move cursor to the start of the line and clear to end of line
     sys.stdout.write('\033[1G\033[K')
-    # Print the progress bar with new format
-    sys.stdout.write(f'Sending {bar} {percent:3d}% ({current}/{total})')
+    sys.stdout.write(f'{status} {regions} regions, {size / 1024:.1f} KB in {elapsed * 1000:.0f} ms')
     sys.stdout.flush()
 
 def main():
@@ -245,7 +564,8 @@ def main():
     
     # Configuration
     TFT_SIZE = (240, 240)
-    screen_width, screen_height = get_screen_size()
+    sct = mss.mss() if HAS_MSS else None
+    screen_width, screen_height = get_screen_size(sct)
     frame_delay = 1.0 / args.fps
     
     # Get capture area
@@ -253,32 +573,62 @@ def main():
     if args.width is not None and args.height is not None:
         capture_area = (0, 0, args.width, args.height)
     
-    # Get image processor
-    process_image = get_processor(args.mode)
+    # A capture that already has the display's size needs no resizing, so
+    # the raw BGRA grab from mss is diffed and packed directly
+    capture_size = (capture_area[2] - capture_area[0], capture_area[3] - capture_area[1])
+    capture_bgra = sct is not None and capture_size == TFT_SIZE
+    channel_order = 'BGRA' if capture_bgra else 'RGB'
+
+    # Get image processor, bound once to the display size and resize filter
+    process_image = functools.partial(
+        get_processor(args.mode),
+        target_size=TFT_SIZE,
+        resample=Image.Resampling[args.filter.upper()])
+    client = DisplayClient(args.ip)
+
+    # Network sends run on their own thread so the display's acknowledgment
+    # does not hold up capturing the next frame
+    updates = queue.Queue(maxsize=2)
+    sender = threading.Thread(target=send_worker, args=(client, updates), daemon=True)
+    sender.start()
     
-    previous_frame = None
+    previous_array = None
+    chunk_hashes = {}
     
     # Print initial info
     print(f"Screen resolution: {screen_width}x{screen_height}")
     print(f"Capture area: {capture_area}")
     print(f"Display mode: {args.mode}")
+    print(f"Resize filter: {args.filter}")
     print(f"Target FPS: {args.fps}")
     print("Press Ctrl+C to stop")
     
     try:
         while True:
             start_time = time.time()
-            # Capture screen
-            screenshot = capture_screen_area(capture_area)
-            # Process image according to display mode
-            current_frame = process_image(screenshot, TFT_SIZE)
-            # Find changed regions and send updates
-            regions = find_changed_regions(current_frame, previous_frame)
-            for i, region in enumerate(regions, 1):
-                print_progress(i, len(regions))
-                send_regions(args.ip, [region])
+            current_array = None
+            if capture_bgra:
+                current_array = capture_screen_array(capture_area, sct)
+                if current_array is None:
+                    # The grab is in physical (HiDPI) pixels and needs
+                    # resizing; switch to the regular path for good
+                    capture_bgra = False
+                    channel_order = 'RGB'
+                    previous_array = None
+            if current_array is None:
+                # Capture screen
+                screenshot = capture_screen_area(capture_area, sct)
+                # Process image according to display mode
+                current_frame = process_image(screenshot)
+                current_array = pil_to_np(current_frame)
+            # Find changed chunks and send updates
+            update = find_changed_chunks(current_array, previous_array, channel_order=channel_order,
+                                         chunk_hashes=chunk_hashes)
+            # All regions go out as one update with a single acknowledgment
+            if update.changed.any():
+                queue_update(updates, update)
             
-            previous_frame = current_frame
+            previous_array = current_array
             # Calculate sleep time to maintain target FPS
             elapsed = time.time() - start_time
             sleep_time = max(0, frame_delay - elapsed)
@@ -288,6 +638,13 @@ def main():
         clear_line()
         print("\nStopped screen mirror")
     finally:
+        # Stop the sender, dropping updates it has not started on
+        drain_updates(updates)
+        updates.put(None)
+        sender.join(timeout=2 * client.timeout)
+        client.close()
+        if sct is not None:
+            sct.close()
         # Show cursor
         sys.stdout.write('\033[?25h')
         sys.stdout.flush()
@@ -11,10 +11,19 @@ const char* password = "song940@163.com";
 
 // Server port
 WiFiServer server(80);
+WiFiClient client;
 
-// Buffer for receiving data
-const int MAX_CHUNK_SIZE = 32;  // Maximum size of update regions
-uint16_t updateBuffer[MAX_CHUNK_SIZE * MAX_CHUNK_SIZE];
+// Display size
+const int DISPLAY_WIDTH = 240;
+const int DISPLAY_HEIGHT = 240;
+
+// Most regions accepted in one update (MAX_REGIONS in send.py)
+const int MAX_REGIONS = 100;
+
+// Buffer for receiving data; regions larger than this are received and
+// drawn in bands of whole rows
+const int BUFFER_PIXELS = 32 * 32;
+uint16_t updateBuffer[BUFFER_PIXELS];
 
 void setup() {
   Serial.begin(115200);
@@ -54,28 +63,27 @@ bool readExactBytes(WiFiClient& client, uint8_t* buffer, size_t length) {
 }
 
 void loop() {
-  WiFiClient client = server.accept();
-  if (!client) {
-    return;
+  // Keep the current client across frames; a newly connecting sender
+  // replaces it (e.g. after the sender was restarted)
+  WiFiClient pending = server.accept();
+  if (pending) {
+    client.stop();
+    client = pending;
+    Serial.println("New client connected");
   }
-  
-  Serial.println("New client connected");
-  
-  // Wait for data
-  unsigned long timeout = millis() + 5000;
-  while (!client.available() && millis() < timeout) {
-    delay(10);
+
+  if (!client || !client.connected()) {
+    return;
   }
-  
+
   if (!client.available()) {
-    Serial.println("Client timeout");
-    client.stop();
+    yield();
     return;
   }
   
   // Read number of update regions
   uint8_t numRegions = client.read();
-  if (numRegions == 0 || numRegions > 100) {  // Sanity check
+  if (numRegions == 0 || numRegions > MAX_REGIONS) {  // Sanity check
     Serial.println("Invalid number of regions");
     client.stop();
     return;
@@ -99,46 +107,38 @@ void loop() {
     uint16_t height = (metaData[6] << 8) | metaData[7];
     
     // Validate dimensions
-    if (x + width > 240 || y + height > 240 || 
-        width > MAX_CHUNK_SIZE || height > MAX_CHUNK_SIZE) {
+    if (width == 0 || height == 0 ||
+        x + width > DISPLAY_WIDTH || y + height > DISPLAY_HEIGHT) {
       Serial.println("Invalid region dimensions");
       client.stop();
       return;
     }
     
-    // Read region data
-    // size_t pixelCount = width * height;
-    // Read data row by row
-    for (int row = 0; row < height; row++) {
-      uint16_t* rowBuffer = &updateBuffer[row * width];
-      uint8_t* byteBuffer = (uint8_t*)rowBuffer;
+    // Read region data in bands of as many rows as fit in the buffer
+    int bandRows = BUFFER_PIXELS / width;
+    for (int row = 0; row < height; row += bandRows) {
+      int rows = min(bandRows, height - row);
+      uint8_t* byteBuffer = (uint8_t*)updateBuffer;
       
-      if (!readExactBytes(client, byteBuffer, width * 2)) {
+      if (!readExactBytes(client, byteBuffer, rows * width * 2)) {
         Serial.printf("Failed to read row %d of region %d\n", row, i);
         client.stop();
         return;
       }
       
       // Convert byte order if needed
-      for (int j = 0; j < width; j++) {
+      for (int j = 0; j < rows * width; j++) {
         uint8_t temp = byteBuffer[j*2];
         byteBuffer[j*2] = byteBuffer[j*2 + 1];
         byteBuffer[j*2 + 1] = temp;
       }
+      
+      // Update display with this band of the region
+      tft.pushImage(x, y + row, width, rows, updateBuffer);
+      yield();  // Give time to WiFi tasks
     }
-    
-    // Update display with region data
-    tft.pushImage(x, y, width, height, updateBuffer);
-    yield();  // Give time to WiFi tasks
   }
   
-  // Send acknowledgment
+  // Send acknowledgment and keep the connection open for the next frame
   client.write("OK");
-  delay(10);
-  
-  // Clean up connection
-  while (client.available()) {
-    client.read();
-  }
-  client.stop();
 }
\ No newline at end of file